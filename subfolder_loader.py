@@ -1,18 +1,271 @@
 # subfolder_loader.py
+from __future__ import annotations
+
 import os
 import json
+import asyncio
 import logging
-from typing import List, Tuple, Optional
+import functools
+import heapq
+import threading
+from typing import TYPE_CHECKING, List, Tuple, Optional
 import folder_paths
-from PIL import Image
-import numpy as np
-import torch
+
+# torch, numpy and PIL are only needed to load pixels. They are imported on
+# first use by _import_image_libs so registering the node and building its
+# INPUT_TYPES doesn't depend on them.
+if TYPE_CHECKING:
+    from PIL import Image
+    import numpy as np
+    import torch
+    import comfy.model_management
+else:
+    Image = np = torch = comfy = None
+
+
+def _import_image_libs() -> None:
+    """Import the image/tensor libraries into module globals if not done yet."""
+    global Image, np, torch, comfy
+    if comfy is not None:
+        return
+    from PIL import Image
+    import numpy as np
+    import torch
+    import comfy.model_management
+
+# Optional: watchdog lets listings be invalidated by filesystem events
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+_VALID_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tiff', '.tif')
+# Longest extension above; only this many trailing characters need lowercasing
+_EXTENSION_TAIL = max(len(ext) for ext in _VALID_EXTENSIONS)
+
+# (root_images, [(subfolder_name, image_filenames), ...]) as built by _walk_inputs
+_Listing = Tuple[List[str], List[Tuple[str, List[str]]]]
+
+
+def _is_image_entry(entry: os.DirEntry) -> bool:
+    """Check whether a scandir entry is a supported image file."""
+    # Name check first: it is pure string work, is_file() may need a stat for symlinks
+    if not entry.name[-_EXTENSION_TAIL:].lower().endswith(_VALID_EXTENSIONS):
+        return False
+    try:
+        return entry.is_file()
+    except OSError:
+        # Looping or unreadable symlink; skip it like os.path.isfile would
+        return False
+
+
+def _is_subfolder_entry(entry: os.DirEntry) -> bool:
+    """Check whether a scandir entry is a listable (non-hidden) subfolder."""
+    if entry.name.startswith('.'):
+        return False
+    try:
+        return entry.is_dir()
+    except OSError:
+        # Looping or unreadable symlink; skip it like os.path.isdir would
+        return False
+
+
+def _list_images(folder_path: str) -> List[str]:
+    """Sorted image filenames directly inside folder_path."""
+    images = []
+    try:
+        # scandir hands back cached entry types, so no extra stat per file
+        with os.scandir(folder_path) as it:
+            images = [entry.name for entry in it if _is_image_entry(entry)]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    except PermissionError:
+        logging.warning(f"Permission denied accessing {folder_path}")
+    
+    images.sort()
+    return images
+
+
+def _walk_inputs(base_path: str) -> _Listing:
+    """
+    Scan the input directory once.
+    
+    Returns (root_images, subfolders) where subfolders is a sorted list of
+    (subfolder_name, image_filenames) pairs for each direct, non-hidden subfolder.
+    """
+    root_images = []
+    subdirs = []
+    
+    try:
+        with os.scandir(base_path) as it:
+            for entry in it:
+                # is_dir()/is_file() come from the directory entry itself (d_type on
+                # POSIX, find data on Windows); entry.stat() would be a real stat on POSIX
+                if _is_subfolder_entry(entry):
+                    subdirs.append((entry.name, entry.path))
+                elif _is_image_entry(entry):
+                    root_images.append(entry.name)
+    except (FileNotFoundError, NotADirectoryError):
+        return [], []
+    except PermissionError:
+        logging.warning(f"Permission denied accessing {base_path}")
+    
+    root_images.sort()
+    subdirs.sort()
+    return root_images, [(name, _list_images(path)) for name, path in subdirs]
+
+
+def _input_signature(base_path: str) -> Optional[Tuple[int, Tuple[Tuple[str, int], ...]]]:
+    """
+    Cheap change detector for the input tree.
+    
+    Adding or removing a file only bumps the mtime of its own directory, so the
+    signature is the root mtime plus the mtime of every direct subfolder.
+    """
+    subdir_mtimes = []
+    try:
+        root_mtime = os.stat(base_path).st_mtime_ns
+        with os.scandir(base_path) as it:
+            for entry in it:
+                if not _is_subfolder_entry(entry):
+                    continue
+                try:
+                    subdir_mtimes.append((entry.name, entry.stat().st_mtime_ns))
+                except OSError:
+                    # One unreadable subfolder must not hide the rest of the tree
+                    continue
+    except OSError:
+        return None
+    subdir_mtimes.sort()
+    return root_mtime, tuple(subdir_mtimes)
+
+
+class _InputWatcher(FileSystemEventHandler):
+    """
+    Watches the input directory and counts listing changes.
+    
+    The counter is combined with the mtime signature, never used on its own:
+    recursive inotify watches don't follow symlinked subfolders, and network
+    filesystems changed from another host produce no events at all. The
+    counter catches changes within one mtime tick. Without watchdog, or if
+    the watch cannot be started, callers use _input_signature alone.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.path: Optional[str] = None
+        self.generation = 0
+        self._observer = None
+        self._failed_path: Optional[str] = None
+        # version() runs on the event loop and in executor threads
+        self._lock = threading.Lock()
+    
+    # Only events that add, remove or rename entries change a listing;
+    # modified/opened/closed events fire on every read and write of an image
+    def on_created(self, event):
+        self.generation += 1
+    
+    def on_deleted(self, event):
+        self.generation += 1
+    
+    def on_moved(self, event):
+        self.generation += 1
+    
+    def version(self, base_path: str) -> Optional[int]:
+        """Current generation for base_path, or None if it is not being watched."""
+        if Observer is None:
+            return None
+        with self._lock:
+            if self.path == base_path and self._observer.is_alive():
+                return self.generation
+            if self._failed_path == base_path:
+                return None
+            return self._start(base_path)
+    
+    def _start(self, base_path: str) -> Optional[int]:
+        # Called with self._lock held
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+            self.path = None
+        try:
+            observer = Observer()
+            observer.daemon = True
+            observer.schedule(self, base_path, recursive=True)
+            observer.start()
+        except Exception as e:
+            logging.warning(f"Could not watch {base_path}, using mtime checks only: {str(e)}")
+            self._failed_path = base_path
+            return None
+        self._observer = observer
+        self.path = base_path
+        # New generation so nothing cached before the watch started is reused
+        self.generation += 1
+        return self.generation
+
+
+_input_watcher = _InputWatcher()
+
+
+@functools.lru_cache(maxsize=32)
+def _walk_cached(base_path: str, signature) -> _Listing:
+    """_walk_inputs memoized on the input tree signature. Results are shared, do not mutate."""
+    return _walk_inputs(base_path)
+
+
+def _scan_inputs(base_path: str, refresh: bool = False) -> _Listing:
+    """
+    Return the (possibly cached) listing of base_path, rescanning only when it changed.
+    
+    refresh=True always rescans, for when the user explicitly asks to refresh.
+    """
+    if refresh:
+        return _walk_inputs(base_path)
+    
+    signature = _input_signature(base_path)
+    if signature is None:
+        return [], []
+    return _walk_cached(base_path, (_input_watcher.version(base_path), signature))
+
+def _unit_float_tensor(array: np.ndarray, device: torch.device) -> torch.Tensor:
+    """Convert a uint8 array to a float32 tensor in 0..1 on the given device."""
+    if device.type == 'cuda':
+        # Upload the uint8 data (a quarter of the float bytes) from pinned memory
+        # and scale on the GPU, so the copy overlaps with other host work
+        staging = torch.empty(array.shape, dtype=torch.uint8, pin_memory=True)
+        staging.numpy()[...] = array
+        return staging.to(device, non_blocking=True).float().mul_(1.0 / 255.0)
+    
+    # Cast and scale to 0..1 in a single pass
+    out = np.empty(array.shape, dtype=np.float32)
+    np.multiply(array, np.float32(1.0 / 255.0), out=out)
+    return torch.from_numpy(out)
 
 # Optional: Add server route for refresh functionality
 try:
     import server
     from aiohttp import web
     
+    # orjson is optional; it serializes large image lists much faster than json
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    
+    def _json_response(payload: dict, status: int = 200) -> web.Response:
+        """JSON response, encoded with orjson when it is installed."""
+        if orjson is not None:
+            try:
+                return web.Response(body=orjson.dumps(payload), status=status,
+                                    content_type='application/json')
+            except TypeError:
+                # orjson rejects non-UTF-8 filenames (surrogate escapes from
+                # os.fsdecode) that the stdlib encoder handles
+                pass
+        return web.json_response(payload, status=status)
+    
     @server.PromptServer.instance.routes.post("/subfolder_loader/refresh")
     async def refresh_file_listings(request):
         """API endpoint to refresh file listings."""
@@ -21,20 +274,20 @@ try:
             node_id = data.get('node_id')
             subfolder = data.get('subfolder', '')
             
-            # Get fresh file listings
+            # Get fresh file listings. Directory scans block, so run them in the
+            # default executor to keep the server's event loop responsive.
             input_dir = folder_paths.get_input_directory()
-            subfolders = SubfolderImageLoader.get_subfolders(input_dir)
-            
-            # Get filtered images for the specified subfolder
-            if subfolder:
-                filtered_images = SubfolderImageLoader.get_images_for_subfolder(subfolder)
-            else:
-                filtered_images = SubfolderImageLoader.get_images_for_subfolder("")
+            loop = asyncio.get_running_loop()
+            # The user asked for fresh listings, so skip the listing cache
+            listing = await loop.run_in_executor(None, _scan_inputs, input_dir, True)
             
-            # Also get all images for client-side filtering if needed
-            all_images = SubfolderImageLoader.get_all_images_with_paths(input_dir)
+            # Subfolders, the selected folder's images and all images (for
+            # client-side filtering) share one scan
+            subfolders = SubfolderImageLoader.get_subfolders(input_dir, listing)
+            filtered_images = SubfolderImageLoader.get_images_for_subfolder(subfolder or "", listing)
+            all_images = SubfolderImageLoader.get_all_images_with_paths(input_dir, listing)
             
-            return web.json_response({
+            return _json_response({
                 'success': True,
                 'subfolders': subfolders,
                 'images': all_images,  # All images with paths for client filtering
@@ -43,7 +296,7 @@ try:
             })
         except Exception as e:
             logging.error(f"Refresh error: {str(e)}")
-            return web.json_response({
+            return _json_response({
                 'success': False,
                 'error': str(e)
             }, status=500)
@@ -67,17 +320,46 @@ class SubfolderImageLoader:
     - Right-click menu option to refresh file listings
     """
     
+    # (input_dir, abspath(input_dir)) resolved on first use
+    _input_dir_abs: Optional[Tuple[str, str]] = None
+    
+    @classmethod
+    def _get_input_dir_abs(cls) -> str:
+        """Absolute input directory, resolved once per configured input path."""
+        input_dir = folder_paths.get_input_directory()
+        cached = cls._input_dir_abs
+        if cached is None or cached[0] != input_dir:
+            cached = cls._input_dir_abs = (input_dir, os.path.abspath(input_dir))
+        return cached[1]
+    
+    # (input_dir, version, schema) from the last INPUT_TYPES call
+    _schema_cache: Optional[Tuple[str, tuple, dict]] = None
+    
     @classmethod
     def INPUT_TYPES(cls):
         input_dir = folder_paths.get_input_directory()
         
+        # The schema only lists direct subfolders and root images, both of which
+        # bump the root directory's mtime when they change. The watch counter,
+        # if any, also catches changes within one mtime tick.
+        try:
+            version = (_input_watcher.version(input_dir), os.stat(input_dir).st_mtime_ns)
+        except OSError:
+            version = None
+        cached = cls._schema_cache
+        if version is not None and cached is not None and cached[:2] == (input_dir, version):
+            return cached[2]
+        
+        # One listing serves both widgets
+        listing = _scan_inputs(input_dir)
+        
         # Get available subfolders
-        subfolders = cls.get_subfolders(input_dir)
+        subfolders = cls.get_subfolders(input_dir, listing)
         
         # Start with images from root folder (no subfolder selected)
-        default_images = cls.get_images_for_subfolder("")
+        default_images = list(listing[0])
         
-        return {
+        schema = {
             "required": {
                 "subfolder": (subfolders, {
                     "default": subfolders[0] if subfolders else "",
@@ -94,83 +376,83 @@ class SubfolderImageLoader:
                     "default": True,
                     "tooltip": "Extract alpha channel as mask from RGBA/transparent images. Disable if you don't need transparency masks."
                 }),
+                "metadata_only": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "Only read the image header for filename, width and height. The image and mask outputs are 1x1 placeholders and no pixels are decoded."
+                }),
+                "max_dimension": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 16384,
+                    "tooltip": "Downscale so the longest side is at most this many pixels, keeping the aspect ratio. JPEGs are decoded directly at reduced size. 0 loads at full resolution."
+                }),
             }
         }
+        
+        if version is not None:
+            cls._schema_cache = (input_dir, version, schema)
+        return schema
     
     @classmethod 
-    def get_images_for_subfolder(cls, subfolder: str = "") -> list:
-        """Get filtered images for a specific subfolder."""
-        input_dir = folder_paths.get_input_directory()
-        all_images = cls.get_all_images_with_paths(input_dir)
+    def get_images_for_subfolder(cls, subfolder: str = "", listing: Optional[_Listing] = None) -> list:
+        """Get filtered images for a specific subfolder.
         
-        if not subfolder or subfolder == "":
-            # Root folder - show only images without subfolder (no slash)
-            return [img for img in all_images if '/' not in img]
-        else:
-            # Specific subfolder - show images WITH subfolder prefix for ComfyUI compatibility
-            prefix = subfolder + "/"
-            filtered = [img for img in all_images 
-                       if img.startswith(prefix) and '/' not in img[len(prefix):]]
-            return filtered
-    
-    @classmethod
-    def get_subfolders(cls, base_path: str) -> List[str]:
-        """Get list of subfolders in the base directory."""
-        if not os.path.exists(base_path):
-            return [""]
+        Pass a listing already obtained from _scan_inputs to avoid rescanning.
+        """
+        if listing is not None:
+            root_images, subdirs = listing
+            if not subfolder:
+                return list(root_images)
+            for name, images in subdirs:
+                if name == subfolder:
+                    return [f"{subfolder}/{img}" for img in images]
+            # Not a direct, non-hidden subfolder
+            return []
         
-        subfolders = [""]  # Include root/no subfolder option
+        input_dir = folder_paths.get_input_directory()
         
-        try:
-            for item in sorted(os.listdir(base_path)):
-                item_path = os.path.join(base_path, item)
-                if os.path.isdir(item_path) and not item.startswith('.'):
-                    subfolders.append(item)
-        except PermissionError:
-            logging.warning(f"Permission denied accessing {base_path}")
+        if not subfolder:
+            # Root folder - plain filenames
+            return _list_images(input_dir)
         
-        return subfolders
+        # Only direct, non-hidden subfolders are listed; anything else (nested or
+        # traversal paths from the refresh route) would never have matched before
+        if os.path.basename(subfolder) != subfolder or subfolder.startswith('.'):
+            return []
+        
+        # Specific subfolder - show images WITH subfolder prefix for ComfyUI compatibility
+        images = _list_images(os.path.join(input_dir, subfolder))
+        return [f"{subfolder}/{img}" for img in images]
     
     @classmethod
-    def get_all_images_with_paths(cls, base_path: str) -> List[str]:
-        """Get all images with their relative paths."""
-        all_images = []
-        
-        if not os.path.exists(base_path):
-            return all_images
+    def get_subfolders(cls, base_path: str, listing: Optional[_Listing] = None) -> List[str]:
+        """Get list of subfolders in the base directory.
         
-        # Get images from root
-        root_images = cls.get_images_from_folder(base_path)
-        all_images.extend(root_images)
-        
-        # Get images from each subfolder with path prefix
-        for subfolder in cls.get_subfolders(base_path):
-            if subfolder:  # Skip empty root option
-                subfolder_path = os.path.join(base_path, subfolder)
-                images = cls.get_images_from_folder(subfolder_path)
-                # Add with subfolder prefix
-                for img in images:
-                    all_images.append(f"{subfolder}/{img}")
+        Pass a listing already obtained from _scan_inputs to avoid rescanning.
+        """
+        _, subdirs = listing if listing is not None else _scan_inputs(base_path)
+        # Include root/no subfolder option
+        return [""] + [name for name, _ in subdirs]
+    
+    @classmethod
+    def get_all_images_with_paths(cls, base_path: str, listing: Optional[_Listing] = None) -> List[str]:
+        """Get all images with their relative paths.
         
-        return sorted(all_images)
+        Pass a listing already obtained from _scan_inputs to avoid rescanning.
+        """
+        root_images, subdirs = listing if listing is not None else _scan_inputs(base_path)
+        # Each folder listing is already sorted, so merge instead of re-sorting everything
+        return list(heapq.merge(
+            root_images,
+            # map() binds each prefix now; a generator expression here would late-bind
+            # subfolder and give every stream the last folder's name
+            *[map(f"{subfolder}/".__add__, images) for subfolder, images in subdirs]
+        ))
     
     @classmethod
     def get_images_from_folder(cls, folder_path: str) -> List[str]:
         """Get image files from a specific folder."""
-        if not os.path.exists(folder_path):
-            return []
-        
-        valid_extensions = {'.png', '.jpg', '.jpeg', '.webp', '.bmp', '.tiff', '.tif'}
-        images = []
-        
-        try:
-            for file in sorted(os.listdir(folder_path)):
-                if os.path.splitext(file.lower())[1] in valid_extensions:
-                    images.append(file)
-        except PermissionError:
-            logging.warning(f"Permission denied accessing {folder_path}")
-        
-        return images
+        return _list_images(folder_path)
     
     @classmethod
     def VALIDATE_INPUTS(cls, subfolder="", image="", **kwargs):
@@ -210,8 +492,9 @@ class SubfolderImageLoader:
         # Validate it's within the input directory
         try:
             file_path_abs = os.path.abspath(file_path)
-            input_dir_abs = os.path.abspath(input_dir)
-            if not file_path_abs.startswith(input_dir_abs):
+            input_dir_abs = cls._get_input_dir_abs()
+            # commonpath compares whole components, so /input_evil is not under /input
+            if os.path.commonpath([file_path_abs, input_dir_abs]) != input_dir_abs:
                 return "Invalid file path: outside input directory"
         except Exception:
             return "Invalid file path"
@@ -247,7 +530,8 @@ class SubfolderImageLoader:
     
     DESCRIPTION = "Load images from subfolders with dynamic filtering. Organize your images in subfolders and select them easily."
     
-    def load_image(self, subfolder: str = "", image: str = "", load_mask: bool = True, **kwargs) -> Tuple:
+    def load_image(self, subfolder: str = "", image: str = "", load_mask: bool = True,
+                   metadata_only: bool = False, max_dimension: int = 0, **kwargs) -> Tuple:
         """
         Load image from the specified subfolder.
         
@@ -255,10 +539,14 @@ class SubfolderImageLoader:
             subfolder: Selected subfolder name
             image: Image filename or path (may contain subfolder prefix)
             load_mask: Whether to extract alpha channel as mask
+            metadata_only: Only read dimensions from the header, skip pixel decode
+            max_dimension: Longest side of the loaded image, 0 for full resolution
             
         Returns:
             Tuple of (image_tensor, mask_tensor, filename, width, height)
         """
+        _import_image_libs()
+        
         try:
             if not image:
                 raise ValueError("No image specified")
@@ -280,8 +568,15 @@ class SubfolderImageLoader:
             # This handles the path resolution and validation automatically
             file_path = folder_paths.get_annotated_filepath(image_identifier)
             
+            if metadata_only:
+                # Image.open only parses the header; pixels are never decoded
+                width, height = self.read_image_size(file_path)
+                empty_image = torch.zeros((1, 1, 1, 3), dtype=torch.float32)
+                empty_mask = torch.ones((1, 1, 1), dtype=torch.float32)
+                return (empty_image, empty_mask, clean_image, width, height)
+            
             # Load and process image
-            image_tensor, mask_tensor = self.process_image(file_path, load_mask)
+            image_tensor, mask_tensor = self.process_image(file_path, load_mask, max_dimension)
             
             # Get image dimensions
             height, width = image_tensor.shape[1:3]
@@ -296,54 +591,74 @@ class SubfolderImageLoader:
             empty_mask = torch.zeros((1, 512, 512), dtype=torch.float32)
             return (empty_image, empty_mask, "error", 512, 512)
     
-    def process_image(self, file_path: str, load_mask: bool = True) -> Tuple[torch.Tensor, torch.Tensor]:
+    def read_image_size(self, file_path: str) -> Tuple[int, int]:
+        """Read (width, height) from the image header without decoding pixels."""
+        _import_image_libs()
+        with Image.open(file_path) as img:
+            return img.size
+    
+    def process_image(self, file_path: str, load_mask: bool = True,
+                      max_dimension: int = 0) -> Tuple[torch.Tensor, torch.Tensor]:
         """Process image file into tensors."""
+        _import_image_libs()
         with Image.open(file_path) as img:
-            # Store original mode
-            original_mode = img.mode
             mask_array = None
             
+            if max_dimension > 0 and max(img.size) > max_dimension:
+                if img.mode in ('P', '1'):
+                    # Pillow resizes these modes with NEAREST; convert first so they
+                    # (and the transparency mask) get the same filter as RGB images
+                    if img.mode == 'P' and load_mask and 'transparency' in img.info:
+                        img = img.convert('RGBA')
+                    else:
+                        img = img.convert('RGB')
+                # For JPEGs, thumbnail() first calls draft() with the aspect-preserved
+                # target so libjpeg decodes at 1/2, 1/4 or 1/8 scale, then resamples
+                img.thumbnail((max_dimension, max_dimension))
+            
             # Handle different image modes
-            if img.mode == 'RGBA' and load_mask:
-                # Extract alpha channel as mask before conversion
-                mask_array = np.array(img.getchannel('A'))
-                img = img.convert('RGB')
+            if img.mode == 'RGB':
+                # Already in the target mode (e.g. most JPEGs), no conversion pass
+                pass
+            elif img.mode == 'RGBA' and load_mask:
+                # Split once and keep alpha as mask instead of a separate RGB convert
+                bands = img.split()
+                mask_array = np.asarray(bands[3])
+                img = Image.merge('RGB', bands[:3])
             elif img.mode == 'P':
-                # Convert palette images
-                if 'transparency' in img.info:
-                    img = img.convert('RGBA')
-                    if load_mask:
-                        mask_array = np.array(img.getchannel('A'))
-                    img = img.convert('RGB')
+                # Convert palette images; go through RGBA only when the mask is wanted
+                if load_mask and 'transparency' in img.info:
+                    bands = img.convert('RGBA').split()
+                    mask_array = np.asarray(bands[3])
+                    img = Image.merge('RGB', bands[:3])
                 else:
                     img = img.convert('RGB')
             elif img.mode == 'L':
                 # Convert grayscale to RGB
                 img = img.convert('RGB')
-            elif img.mode not in ['RGB']:
+            else:
                 # Convert any other mode to RGB
                 img = img.convert('RGB')
             
-            # Convert to numpy array
-            image_array = np.array(img, dtype=np.float32) / 255.0
+            image_u8 = np.asarray(img)
             
-            # Ensure we have 3 channels
-            if len(image_array.shape) == 2:
-                image_array = np.stack([image_array] * 3, axis=-1)
+            # Ensure we have 3 channels. A broadcast view is enough here:
+            # _unit_float_tensor writes into a fresh buffer, which does the one copy
+            if len(image_u8.shape) == 2:
+                image_u8 = np.broadcast_to(image_u8[..., None], image_u8.shape + (3,))
             
-            # Convert to tensor
-            image_tensor = torch.from_numpy(image_array)
+            # Follow ComfyUI's device policy (CPU unless e.g. --gpu-only is set)
+            device = comfy.model_management.intermediate_device()
             
-            # Add batch dimension
-            image_tensor = image_tensor.unsqueeze(0)
+            # Convert to tensor and add batch dimension
+            image_tensor = _unit_float_tensor(image_u8, device).unsqueeze(0)
             
             # Create mask tensor
             if load_mask and mask_array is not None:
-                mask_tensor = torch.from_numpy(mask_array.astype(np.float32) / 255.0)
-                mask_tensor = mask_tensor.unsqueeze(0)
+                mask_tensor = _unit_float_tensor(mask_array, device).unsqueeze(0)
             else:
                 # Create default mask (all opaque)
                 h, w = image_tensor.shape[1:3]
-                mask_tensor = torch.ones((1, h, w), dtype=torch.float32)
+                mask_tensor = torch.ones((1, h, w), dtype=torch.float32, device=device)
             
             return image_tensor, mask_tensor